@@ -3,9 +3,34 @@
 # ============================================================================
 import pandas as pd
 import numpy as np
+import os
+import sys
+import matplotlib
 import matplotlib.pyplot as plt
 from datetime import datetime
 
+# No screen attached (batch/cloud run): draw to files with the Agg backend
+IN_NOTEBOOK = 'ipykernel' in sys.modules
+HEADLESS = (not IN_NOTEBOOK and sys.platform.startswith('linux')
+            and not os.environ.get('DISPLAY') and not os.environ.get('WAYLAND_DISPLAY'))
+if HEADLESS:
+    matplotlib.use('Agg')
+
+# pyarrow is optional: when installed the recommendations CSV is written with
+# Arrow's multi-threaded CSV writer, otherwise with DataFrame.to_csv
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
+
+# Outside a notebook, display() just prints the table as text
+if IN_NOTEBOOK:
+    from IPython.display import display
+else:
+    def display(obj):
+        print(obj.to_string() if hasattr(obj, 'to_string') else obj)
+
 print("✅ Libraries loaded successfully!")
 print(f"📅 {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
@@ -35,6 +60,14 @@ data = {
 
 df = pd.DataFrame(data)
 
+# Sizes (< 5000 MB) and day counts (< 365) fit in int16: a quarter of the
+# default int64 memory for every scan over these columns
+df = df.astype({'size_mb': 'int16', 'last_accessed_days': 'int16'})
+
+# Tier and container become categoricals; tiers sort Hot -> Cool -> Archive
+tier_dtype = pd.CategoricalDtype(['Hot', 'Cool', 'Archive'], ordered=True)
+df = df.astype({'access_tier': tier_dtype, 'container': 'category'})
+
 print(f"✅ Generated {len(df)} blobs")
 print(f"📦 Containers: {df['container'].nunique()}")
 print(f"🔄 Tiers: {df['access_tier'].unique().tolist()}\n")
@@ -52,12 +85,11 @@ print("💰 CALCULATING COSTS\n")
 # Azure pricing per GB/month
 tier_costs = {'Hot': 0.018, 'Cool': 0.01, 'Archive': 0.00099}
 
-# Calculate monthly cost
-df['monthly_cost'] = df.apply(
-    lambda row: (row['size_mb']/1024) * tier_costs[row['access_tier']], 
-    axis=1
-)
-df['size_gb'] = df['size_mb'] / 1024
+# Calculate monthly cost (map each tier to its price, then multiply column-wise)
+size_gb = df['size_mb'].to_numpy(np.float64) / 1024
+tier_cost_arr = df['access_tier'].map(tier_costs).to_numpy(np.float64)
+df['monthly_cost'] = size_gb * tier_cost_arr
+df['size_gb'] = size_gb
 
 print(f"💵 Total Monthly Cost: ${df['monthly_cost'].sum():.2f}")
 print(f"📊 Total Storage: {df['size_gb'].sum():.2f} GB")
@@ -65,7 +97,7 @@ print(f"📈 Average blob size: {df['size_gb'].mean():.2f} GB\n")
 
 # Cost by tier
 print("💰 Cost by Access Tier:")
-tier_cost_summary = df.groupby('access_tier')['monthly_cost'].sum().sort_values(ascending=False)
+tier_cost_summary = df.groupby('access_tier', observed=True)['monthly_cost'].sum().sort_values(ascending=False)
 for tier, cost in tier_cost_summary.items():
     pct = (cost / df['monthly_cost'].sum()) * 100
     print(f"  {tier:8s}: ${cost:7.2f} ({pct:5.1f}%)")
@@ -79,7 +111,7 @@ print("=" * 70)
 
 # By container
 print("\n📦 Storage by Container:")
-container_summary = df.groupby('container').agg({
+container_summary = df.groupby('container', observed=True).agg({
     'size_gb': ['sum', 'mean', 'count'],
     'monthly_cost': 'sum'
 }).round(2)
@@ -89,7 +121,7 @@ display(container_summary)
 
 # By tier
 print("\n🔄 Storage by Access Tier:")
-tier_summary = df.groupby('access_tier').agg({
+tier_summary = df.groupby('access_tier', observed=True).agg({
     'blob_name': 'count',
     'size_gb': 'sum',
     'monthly_cost': 'sum'
@@ -99,11 +131,18 @@ tier_summary = tier_summary.sort_values('Monthly_Cost', ascending=False)
 display(tier_summary)
 
 # Access pattern statistics
+# Count "unused for N+ days" straight from a NumPy view of the column:
+# np.count_nonzero() needs no sort and never builds a filtered DataFrame.
+# The counts are reused by the final report
+access_days = df['last_accessed_days'].to_numpy()
+unused_90 = np.count_nonzero(access_days > 90)
+unused_180 = np.count_nonzero(access_days > 180)
+
 print("\n📈 Access Pattern Statistics:")
 print(f"  Average days since access: {df['last_accessed_days'].mean():.1f}")
 print(f"  Median days since access: {df['last_accessed_days'].median():.1f}")
-print(f"  Blobs not accessed in 90+ days: {len(df[df['last_accessed_days'] > 90])}")
-print(f"  Blobs not accessed in 180+ days: {len(df[df['last_accessed_days'] > 180])}")
+print(f"  Blobs not accessed in 90+ days: {unused_90}")
+print(f"  Blobs not accessed in 180+ days: {unused_180}")
 
 
 # ============================================================================
@@ -164,29 +203,48 @@ print(f"   ROI: {(total_monthly_savings/df['monthly_cost'].sum()*100):.1f}% cost
 print("\n📊 CREATING VISUAL DASHBOARD")
 print("=" * 70)
 
+# Precompute every dashboard aggregate up front so each plot only indexes
+# a prebuilt result:
+# - per-container totals (Plots 1 and 6, final report)
+# - per-tier cost and blob count (Plots 2 and 3, final report)
+# - the access-age histogram (Plot 4)
+container_agg = df.groupby('container', observed=True, sort=False).agg(
+    size_gb=('size_gb', 'sum'), monthly_cost=('monthly_cost', 'sum'))
+# access_tier has three known categories, so its integer codes index straight
+# into np.bincount output slots: a linear scan instead of a hash groupby
+tier_codes = df['access_tier'].cat.codes.to_numpy()
+n_tiers = len(df['access_tier'].cat.categories)
+tier_agg = pd.DataFrame({
+    'monthly_cost': np.bincount(tier_codes, weights=df['monthly_cost'].to_numpy(), minlength=n_tiers),
+    'count': np.bincount(tier_codes, minlength=n_tiers),
+}, index=df['access_tier'].cat.categories)
+# minlength=n_tiers keeps a slot for every tier; drop empty ones so the
+# charts get no 0% wedges or zero-height bars (as groupby(observed=True) did)
+tier_agg = tier_agg[tier_agg['count'] > 0]
+day_hist, day_edges = np.histogram(df['last_accessed_days'].to_numpy(), bins=30)
+
 fig, axes = plt.subplots(2, 3, figsize=(18, 10))
 fig.suptitle('Azure Blob Storage Analysis Dashboard', fontsize=18, fontweight='bold', y=0.995)
 
 # Plot 1: Storage by Container (Bar Chart)
-container_storage = df.groupby('container')['size_gb'].sum().sort_values(ascending=False)
+container_storage = container_agg['size_gb'].sort_values(ascending=False)
 bars = axes[0, 0].bar(container_storage.index, container_storage.values, 
                        color='#0078D4', edgecolor='black', linewidth=1.5)
 axes[0, 0].set_title('Storage by Container (GB)', fontweight='bold', fontsize=12)
 axes[0, 0].set_ylabel('Size (GB)', fontsize=10)
 axes[0, 0].grid(axis='y', alpha=0.3)
 # Add value labels on bars
-for bar in bars:
-    height = bar.get_height()
-    axes[0, 0].text(bar.get_x() + bar.get_width()/2., height + 5,
-                     f'{height:.0f}', ha='center', va='bottom', fontweight='bold')
+axes[0, 0].bar_label(bars, fmt='%.0f', padding=3, fontweight='bold')
 
 # Plot 2: Cost Distribution by Tier (Pie Chart)
-tier_costs_plot = df.groupby('access_tier')['monthly_cost'].sum()
-colors = ['#FF6B6B', '#4ECDC4', '#95E1D3']
+# Colors keyed by tier name, so each tier keeps its color whatever order
+# or subset of tiers the aggregates come out in
+tier_colors = {'Archive': '#FF6B6B', 'Cool': '#4ECDC4', 'Hot': '#95E1D3'}
+tier_costs_plot = tier_agg['monthly_cost']
 wedges, texts, autotexts = axes[0, 1].pie(tier_costs_plot.values, 
                                             labels=tier_costs_plot.index, 
                                             autopct='%1.1f%%',
-                                            colors=colors,
+                                            colors=[tier_colors[t] for t in tier_costs_plot.index],
                                             startangle=90,
                                             textprops={'fontweight': 'bold'})
 axes[0, 1].set_title('Cost Distribution by Tier', fontweight='bold', fontsize=12)
@@ -195,21 +253,19 @@ for autotext in autotexts:
     autotext.set_fontsize(10)
 
 # Plot 3: Blob Count by Tier (Bar Chart)
-tier_counts = df['access_tier'].value_counts()
+tier_counts = tier_agg['count'].sort_values(ascending=False)
 bars3 = axes[0, 2].bar(tier_counts.index, tier_counts.values,
-                        color=['#FF6B6B', '#4ECDC4', '#95E1D3'],
+                        color=[tier_colors[t] for t in tier_counts.index],
                         edgecolor='black', linewidth=1.5)
 axes[0, 2].set_title('Blob Count by Tier', fontweight='bold', fontsize=12)
 axes[0, 2].set_ylabel('Number of Blobs', fontsize=10)
 axes[0, 2].grid(axis='y', alpha=0.3)
-for bar in bars3:
-    height = bar.get_height()
-    axes[0, 2].text(bar.get_x() + bar.get_width()/2., height + 2,
-                     f'{int(height)}', ha='center', va='bottom', fontweight='bold')
+axes[0, 2].bar_label(bars3, fmt='%d', padding=3, fontweight='bold')
 
 # Plot 4: Access Pattern Histogram
-axes[1, 0].hist(df['last_accessed_days'], bins=30, color='#107C10', 
-                edgecolor='black', alpha=0.7)
+# Draw the precomputed bin counts as bars instead of letting hist() rebin
+axes[1, 0].bar(day_edges[:-1], day_hist, width=np.diff(day_edges), align='edge',
+               color='#107C10', edgecolor='black', alpha=0.7)
 axes[1, 0].axvline(x=90, color='red', linestyle='--', linewidth=2, label='90 days (Hot→Cool)')
 axes[1, 0].axvline(x=180, color='orange', linestyle='--', linewidth=2, label='180 days (Cool→Archive)')
 axes[1, 0].set_title('Blob Access Patterns', fontweight='bold', fontsize=12)
@@ -230,20 +286,18 @@ cbar = plt.colorbar(scatter, ax=axes[1, 1])
 cbar.set_label('Days Since Access', fontsize=9)
 
 # Plot 6: Cost by Container (Horizontal Bar)
-container_costs = df.groupby('container')['monthly_cost'].sum().sort_values()
+container_costs = container_agg['monthly_cost'].sort_values()
 bars6 = axes[1, 2].barh(container_costs.index, container_costs.values,
                          color='#50E6FF', edgecolor='black', linewidth=1.5)
 axes[1, 2].set_title('Monthly Cost by Container', fontweight='bold', fontsize=12)
 axes[1, 2].set_xlabel('Cost ($)', fontsize=10)
 axes[1, 2].grid(axis='x', alpha=0.3)
-for i, bar in enumerate(bars6):
-    width = bar.get_width()
-    axes[1, 2].text(width + 0.1, bar.get_y() + bar.get_height()/2.,
-                     f'${width:.2f}', va='center', fontweight='bold', fontsize=9)
+axes[1, 2].bar_label(bars6, fmt='${:.2f}', padding=3, fontweight='bold', fontsize=9)
 
 plt.tight_layout()
 plt.savefig('azure_dashboard.png', dpi=300, bbox_inches='tight')
-plt.show()
+if not HEADLESS:
+    plt.show()
 
 print("\n✅ Dashboard created and saved as 'azure_dashboard.png'")
 
@@ -255,14 +309,20 @@ print("\n📤 EXPORTING RECOMMENDATIONS")
 print("=" * 70)
 
 if len(hot_unused) > 0:
-    # Create detailed recommendations
-    recommendations = hot_unused[['blob_name', 'container', 'size_gb', 
-                                   'last_accessed_days', 'access_tier', 
-                                   'monthly_cost']].copy()
-    
-    recommendations['recommended_tier'] = 'Cool'
-    recommendations['new_monthly_cost'] = recommendations['monthly_cost'] * 0.56
-    recommendations['potential_savings'] = recommendations['monthly_cost'] * 0.44
+    # Create detailed recommendations: build every column up front and
+    # construct the DataFrame once instead of copying and then adding columns
+    monthly_cost = hot_unused['monthly_cost'].to_numpy()
+    recommendations = pd.DataFrame({
+        'blob_name': hot_unused['blob_name'].to_numpy(),
+        'container': hot_unused['container'].array,
+        'size_gb': hot_unused['size_gb'].to_numpy(),
+        'last_accessed_days': hot_unused['last_accessed_days'].to_numpy(),
+        'access_tier': hot_unused['access_tier'].array,
+        'monthly_cost': monthly_cost,
+        'recommended_tier': np.full(monthly_cost.size, 'Cool', dtype=object),
+        'new_monthly_cost': monthly_cost * 0.56,
+        'potential_savings': monthly_cost * 0.44,
+    }, index=hot_unused.index)
     
     # Sort by savings potential
     recommendations = recommendations.sort_values('potential_savings', ascending=False)
@@ -270,7 +330,10 @@ if len(hot_unused) > 0:
     # Export to CSV
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f'azure_optimization_recommendations_{timestamp}.csv'
-    recommendations.to_csv(filename, index=False)
+    if pa is not None:
+        pa_csv.write_csv(pa.Table.from_pandas(recommendations, preserve_index=False), filename)
+    else:
+        recommendations.to_csv(filename, index=False)
     
     print(f"\n✅ Exported {len(recommendations)} recommendations to: {filename}")
     print(f"\n📋 Top 10 Optimization Opportunities:")
@@ -298,10 +361,14 @@ print("=" * 70)
 
 total_savings = recommendations['potential_savings'].sum() if len(hot_unused) > 0 else 0
 
+# Blob counts per tier come from the tier aggregate behind Plot 3
+total_blobs = len(df)
+tier_pct = tier_counts / total_blobs * 100
+
 # Create formatted summary
 summary = f"""
 📊 STORAGE OVERVIEW:
-   • Total Blobs: {len(df):,}
+   • Total Blobs: {total_blobs:,}
    • Total Storage: {df['size_gb'].sum():.2f} GB
    • Number of Containers: {df['container'].nunique()}
    • Average Blob Size: {df['size_gb'].mean():.2f} GB
@@ -312,14 +379,14 @@ summary = f"""
    • Most Expensive Container: {container_costs.idxmax()} (${container_costs.max():.2f}/month)
 
 🔄 TIER DISTRIBUTION:
-   • Hot Tier: {len(df[df['access_tier']=='Hot'])} blobs ({len(df[df['access_tier']=='Hot'])/len(df)*100:.1f}%)
-   • Cool Tier: {len(df[df['access_tier']=='Cool'])} blobs ({len(df[df['access_tier']=='Cool'])/len(df)*100:.1f}%)
-   • Archive Tier: {len(df[df['access_tier']=='Archive'])} blobs ({len(df[df['access_tier']=='Archive'])/len(df)*100:.1f}%)
+   • Hot Tier: {tier_counts.get('Hot', 0)} blobs ({tier_pct.get('Hot', 0):.1f}%)
+   • Cool Tier: {tier_counts.get('Cool', 0)} blobs ({tier_pct.get('Cool', 0):.1f}%)
+   • Archive Tier: {tier_counts.get('Archive', 0)} blobs ({tier_pct.get('Archive', 0):.1f}%)
 
 📈 ACCESS PATTERNS:
    • Average days since access: {df['last_accessed_days'].mean():.1f}
-   • Blobs unused 90+ days: {len(df[df['last_accessed_days'] > 90])}
-   • Blobs unused 180+ days: {len(df[df['last_accessed_days'] > 180])}
+   • Blobs unused 90+ days: {unused_90}
+   • Blobs unused 180+ days: {unused_180}
 
 💡 OPTIMIZATION RESULTS:
    • Blobs to optimize: {len(hot_unused) + len(cool_unused)}
@@ -364,7 +431,15 @@ summary_data = pd.DataFrame({
 })
 
 print("\n📊 Quick Reference Table:")
-display(summary_data.style.set_properties(**{'text-align': 'left', 'font-weight': 'bold'}).hide(axis='index'))
+if IN_NOTEBOOK:
+    # Style the table once with CSS rules rather than per-cell properties
+    summary_table = summary_data.style.set_table_styles([
+        {'selector': 'td', 'props': [('text-align', 'left'), ('font-weight', 'bold')]}
+    ]).hide(axis='index')
+else:
+    # Outside a notebook the HTML Styler has nowhere to render: plain text
+    summary_table = summary_data.to_string(index=False)
+display(summary_table)
 
 print("\n" + "=" * 70)
 print("🎓 CONGRATULATIONS!")
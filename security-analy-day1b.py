@@ -5,6 +5,25 @@
 # Import NumPy library for numerical operations
 import numpy as np
 
+# Threat score engines, best first: a Numba kernel, then numexpr, then
+# plain NumPy writing into preallocated buffers
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+# numexpr is optional too: without Numba it evaluates the whole threat score
+# expression as one multi-threaded kernel with no temporary arrays
+try:
+    import numexpr as ne
+except ImportError:
+    ne = None
+
 print("=" * 70)
 print("AZURE SECURITY CENTER - THREAT ANALYSIS DASHBOARD")
 print("=" * 70)
@@ -98,30 +117,33 @@ print("🚨 THREAT IDENTIFICATION")
 print("=" * 70)
 
 # Create boolean mask: Find resources with score < 50 (critical threshold)
-critical_mask = security_scores < 50
+# np.flatnonzero(): Turn the mask into the positions of the True values once,
+# so the names and values below are gathered by a few integer indices instead
+# of rescanning the full boolean mask for every array
+critical_idx = np.flatnonzero(security_scores < 50)
 print(f"\nCritical Security Score Resources (< 50):")
-print(f"  Resources: {resource_names[critical_mask]}")
-print(f"  Scores: {security_scores[critical_mask]}")
-print(f"  Count: {np.sum(critical_mask)}")  # np.sum counts True values
+print(f"  Resources: {resource_names[critical_idx]}")
+print(f"  Scores: {security_scores[critical_idx]}")
+print(f"  Count: {critical_idx.size}")  # one index per True value
 
 # Find resources with excessive failed logins (> 30)
-login_threat_mask = failed_logins > 30
+login_threat_idx = np.flatnonzero(failed_logins > 30)
 print(f"\nResources with Excessive Failed Logins (> 30):")
-print(f"  Resources: {resource_names[login_threat_mask]}")
-print(f"  Failed Attempts: {failed_logins[login_threat_mask]}")
-print(f"  Count: {np.sum(login_threat_mask)}")
+print(f"  Resources: {resource_names[login_threat_idx]}")
+print(f"  Failed Attempts: {failed_logins[login_threat_idx]}")
+print(f"  Count: {login_threat_idx.size}")
 
 # Find resources with risky open ports (3389=RDP, 445=SMB)
-risky_ports_mask = (open_ports == 3389) | (open_ports == 445)  # | is OR operator
+risky_ports_idx = np.flatnonzero((open_ports == 3389) | (open_ports == 445))  # | is OR operator
 print(f"\nResources with Risky Ports (RDP/SMB):")
-print(f"  Resources: {resource_names[risky_ports_mask]}")
-print(f"  Ports: {open_ports[risky_ports_mask]}")
+print(f"  Resources: {resource_names[risky_ports_idx]}")
+print(f"  Ports: {open_ports[risky_ports_idx]}")
 
 # Find outdated systems (not patched in 60+ days)
-outdated_mask = days_since_patch > 60
+outdated_idx = np.flatnonzero(days_since_patch > 60)
 print(f"\nOutdated Resources (60+ days without patch):")
-print(f"  Resources: {resource_names[outdated_mask]}")
-print(f"  Days: {days_since_patch[outdated_mask]}")
+print(f"  Resources: {resource_names[outdated_idx]}")
+print(f"  Days: {days_since_patch[outdated_idx]}")
 
 
 # --- Array Arithmetic Operations ---
@@ -136,20 +158,53 @@ print(f"\nRisk Scores (100 - Security Score):")
 print(f"  {risk_scores}")
 
 # Normalize failed logins to 0-100 scale
-# Divide by max value and multiply by 100
+# Divide by max value and multiply by 100 (in place: *= reuses the array)
 max_logins = np.max(failed_logins)
-normalized_logins = (failed_logins / max_logins) * 100
+normalized_logins = failed_logins / max_logins
+normalized_logins *= 100
 print(f"\nNormalized Login Threat Scores (0-100):")
 print(f"  {normalized_logins.astype(int)}")  # .astype(int) converts to integers
 
 # Calculate composite threat score
 # Formula: (Risk Score * 0.4) + (Login Threat * 0.3) + (Patch Delay * 0.3)
-normalized_patch = (days_since_patch / np.max(days_since_patch)) * 100
-composite_threat = (risk_scores * 0.4) + (normalized_logins * 0.3) + (normalized_patch * 0.3)
-
-print(f"\nComposite Threat Scores:")
-for i in range(len(resource_names)):
-    print(f"  {resource_names[i]}: {composite_threat[i]:.2f}")
+@njit(cache=True, fastmath=True, parallel=True)
+def composite_threat_score(security, logins, patch, max_logins, max_patch, out):
+    """
+    Fused normalize + weighted sum: one pass over the inputs, writing into
+    a preallocated output instead of building temporary arrays
+    """
+    for i in prange(security.size):
+        out[i] = ((100 - security[i]) * 0.4
+                  + (logins[i] / max_logins) * 100 * 0.3
+                  + (patch[i] / max_patch) * 100 * 0.3)
+    return out
+
+
+# One output buffer, allocated once and filled in place
+composite_threat = np.empty(total_resources, dtype=np.float64)
+max_patch = np.max(days_since_patch)
+if NUMBA_AVAILABLE:
+    composite_threat_score(security_scores, failed_logins, days_since_patch,
+                           max_logins, max_patch, composite_threat)
+elif ne is not None:
+    ne.evaluate("(100 - s) * 0.4 + (l / ml) * 30 + (p / mp) * 30",
+                local_dict={'s': security_scores, 'l': failed_logins, 'p': days_since_patch,
+                            'ml': float(max_logins), 'mp': float(max_patch)},
+                out=composite_threat)
+else:
+    # out= writes each step into an existing buffer instead of allocating a
+    # new temporary array per operator
+    scratch = np.empty_like(composite_threat)
+    np.multiply(risk_scores, 0.4, out=composite_threat)
+    np.multiply(normalized_logins, 0.3, out=scratch)
+    composite_threat += scratch
+    np.divide(days_since_patch, max_patch, out=scratch)
+    scratch *= 100 * 0.3
+    composite_threat += scratch
+
+# Build the header and all report lines first and write them with a single print() call
+score_lines = [f"  {name}: {score:.2f}" for name, score in zip(resource_names, composite_threat)]
+print("\n".join(["\nComposite Threat Scores:"] + score_lines))
 
 
 # --- Finding Top Threats ---
@@ -157,18 +212,22 @@ print("\n" + "=" * 70)
 print("🎯 TOP 3 CRITICAL THREATS")
 print("=" * 70)
 
-# np.argsort(): Returns indices that would sort array
-# [-3:]: Get last 3 indices (highest values)
-# [::-1]: Reverse to get descending order
-top_threat_indices = np.argsort(composite_threat)[-3:][::-1]
+# np.argpartition(): Moves the 3 highest values to the end in O(n)
+# without fully sorting the array (k is capped so smaller fleets still work)
+# np.argsort() on just those 3 then orders them descending
+k = min(3, composite_threat.size)
+top_idx = np.argpartition(composite_threat, -k)[-k:] if k else np.arange(0)
+top_threat_indices = top_idx[np.argsort(-composite_threat[top_idx])]
 
+report_lines = []
 for rank, idx in enumerate(top_threat_indices, 1):
-    print(f"\n#{rank} - {resource_names[idx]}")
-    print(f"  Composite Threat Score: {composite_threat[idx]:.2f}")
-    print(f"  Security Score: {security_scores[idx]}/100")
-    print(f"  Failed Logins: {failed_logins[idx]}")
-    print(f"  Open Port: {open_ports[idx]}")
-    print(f"  Days Since Patch: {days_since_patch[idx]}")
+    report_lines.append(f"\n#{rank} - {resource_names[idx]}\n"
+                        f"  Composite Threat Score: {composite_threat[idx]:.2f}\n"
+                        f"  Security Score: {security_scores[idx]}/100\n"
+                        f"  Failed Logins: {failed_logins[idx]}\n"
+                        f"  Open Port: {open_ports[idx]}\n"
+                        f"  Days Since Patch: {days_since_patch[idx]}")
+print("\n".join(report_lines))
 
 
 # --- Statistical Summary ---
@@ -177,14 +236,22 @@ print("SECURITY POSTURE SUMMARY")
 print("=" * 70)
 
 # Count resources in different risk categories
-high_risk_count = np.sum(composite_threat > 60)
-medium_risk_count = np.sum((composite_threat >= 30) & (composite_threat <= 60))
-low_risk_count = np.sum(composite_threat < 30)
+# np.digitize(): Bucket every score in one pass (0 = <30, 1 = 30-60, 2 = >60);
+# nextafter(60) keeps a score of exactly 60 in the medium bucket
+# np.bincount(): Count how many scores landed in each bucket
+# np.isfinite(): digitize() would put NaN scores (e.g. every failed_logins
+# is 0, so max_logins is 0) in the high bucket; count those separately
+scored = np.isfinite(composite_threat)
+risk_buckets = np.digitize(composite_threat[scored], [30, np.nextafter(60, np.inf)])
+low_risk_count, medium_risk_count, high_risk_count = np.bincount(risk_buckets, minlength=3)
+unscored_count = total_resources - np.count_nonzero(scored)
 
 print(f"\nRisk Distribution:")
 print(f"  🔴 High Risk (>60): {high_risk_count} resources")
 print(f"  🟡 Medium Risk (30-60): {medium_risk_count} resources")
 print(f"  🟢 Low Risk (<30): {low_risk_count} resources")
+if unscored_count:
+    print(f"  ⚪ Unscored (no valid score): {unscored_count} resources")
 
 # Calculate percentage of compliant resources (score > 70)
 compliant_resources = np.sum(security_scores > 70)
@@ -2,6 +2,32 @@
 # Problem: Identify underutilized VMs to reduce monthly Azure costs
 # Solution: Analyze CPU usage and recommend VM actions (downsize/stop)
 
+import bisect
+import functools
+import math
+import sys
+from dataclasses import dataclass
+
+# NumPy and Numba are NOT imported here: together they add hundreds of ms
+# to start-up, more than the whole single-VM report takes. The helpers
+# below import them on first use, only once the input is large enough to
+# pay that back; small runs stay pure Python.
+
+
+@functools.cache
+def _get_np():
+    """
+    Import NumPy on first call and return the module (cached afterwards)
+    """
+    import numpy as np
+    return np
+
+
+# Report rule lines: built once here and reused by every section header
+# (an empty entry before one in the report buffer becomes the blank line)
+BANNER = "=" * 60
+SEP = "-" * 60
+
 # --- Variables and Basic Data Types ---
 # string: VM name identifier
 vm_name = "prod-web-vm-01"
@@ -21,32 +47,69 @@ is_production = True
 # list: CPU usage samples over time (percentages)
 cpu_samples = [8.2, 15.3, 10.1, 12.8, 9.4, 14.2, 11.5, 13.1]
 
-# dictionary: VM configuration details
-vm_config = {
-    "name": "prod-web-vm-01",
-    "size": "Standard_D4s_v3",
-    "region": "East US",
-    "monthly_cost": 245.00,
-    "cpu_cores": 4
-}
+# dataclass: VM configuration details
+# slots=True stores each field at a fixed offset, so vm_config.name is a
+# direct read instead of hashing a string key into a dict;
+# frozen=True keeps the config read-only once loaded
+@dataclass(slots=True, frozen=True)
+class VMConfig:
+    name: str
+    size: str
+    region: str
+    monthly_cost: float
+    cpu_cores: int
+
+
+vm_config = VMConfig(
+    name="prod-web-vm-01",
+    size="Standard_D4s_v3",
+    region="East US",
+    monthly_cost=245.00,
+    cpu_cores=4,
+)
+
+# VM details layout: (label, VMConfig field, format spec) per report line
+vm_detail_fields = (
+    ("VM Name: ", "name", ""),
+    ("VM Size: ", "size", ""),
+    ("Region: ", "region", ""),
+    ("CPU Cores: ", "cpu_cores", ""),
+    ("Monthly Cost: $", "monthly_cost", ":.2f"),
+)
 
 # tuple: cost thresholds (low, medium, high) - immutable
 cost_thresholds = (100.0, 250.0, 500.0)
 
+# Lookup tables indexed by bisect.bisect_right(): the number of thresholds at or
+# below a value picks its row, replacing an if/elif ladder with one binary search
+cost_categories = ("Low Cost", "Medium Cost", "High Cost", "Very High Cost")
+review_priorities = ("Monitor quarterly", "Monitor monthly", "Monitor weekly", "Monitor daily")
+
+# CPU utilization bands (<10, 10-20, 20-60, 60+) and the action for each,
+# pre-specialized per environment: production VMs are never stopped, so
+# their lowest band downsizes instead
+cpu_bands = (10.0, 20.0, 60.0)
+non_production_actions = (
+    "STOP - Extremely underutilized",
+    "REVIEW - Low utilization, monitor closely",
+    "OPTIMAL - Good utilization",
+    "ALERT - High utilization, consider scaling up",
+)
+production_actions = ("DOWNSIZE - Consider smaller VM size",) + non_production_actions[1:]
+
 
 # --- Functions ---
-def calculate_potential_savings(current_cost, reduction_percentage):
+@functools.lru_cache(maxsize=1024)
+def _recommend_cached(cpu_bucket, is_prod):
     """
-    Calculate potential monthly savings
-    Parameters: 
-        current_cost (float): Current monthly VM cost
-        reduction_percentage (float): Percentage to reduce (0-1)
-    Returns: 
-        savings (float): Monthly savings amount
+    Cached body of recommend_action(), keyed on the bucketed CPU value
     """
-    # arithmetic operators: multiplication and subtraction
-    savings = current_cost * reduction_percentage
-    return savings
+    # bisect.bisect_right(): which CPU band the bucket falls in (0-3)
+    band = bisect.bisect_right(cpu_bands, cpu_bucket)
+    
+    # Pick the environment's table once, then index it by band
+    actions = production_actions if is_prod else non_production_actions
+    return actions[band]
 
 
 def recommend_action(cpu_avg, is_prod):
@@ -58,155 +121,270 @@ def recommend_action(cpu_avg, is_prod):
     Returns:
         recommendation (string): Action to take
     """
-    # Control Flow: if/elif/else with comparison operators
-    
-    # comparison operator: less than (<)
-    if cpu_avg < 10:
-        # logical operator: 'not' to check non-production
-        if not is_prod:
-            return "STOP - Extremely underutilized"
-        else:
-            return "DOWNSIZE - Consider smaller VM size"
-    
-    # comparison operators: >= and <
-    elif cpu_avg >= 10 and cpu_avg < 20:
-        return "REVIEW - Low utilization, monitor closely"
-    
-    # comparison operator: >= and <
-    elif cpu_avg >= 20 and cpu_avg < 60:
-        return "OPTIMAL - Good utilization"
+    # A missing metric (NaN) or inf has no decade to round to: band it
+    # directly, uncached (NaN compares false everywhere and lands in ALERT,
+    # as with the original if/elif ladder)
+    if not math.isfinite(cpu_avg):
+        band = bisect.bisect_right(cpu_bands, cpu_avg)
+        return (production_actions if is_prod else non_production_actions)[band]
     
-    else:
-        return "ALERT - High utilization, consider scaling up"
+    # Round down to the decade (8.5 -> 0, 45.2 -> 40): every band edge is a
+    # multiple of 10, so the bucket lands in the same band as the raw value,
+    # and VMs sharing a bucket reuse one cached answer
+    return _recommend_cached(int(cpu_avg // 10) * 10, bool(is_prod))
+
+
+# Below this many samples math.fsum() is cheaper than importing NumPy and
+# building an array; above it np.add.reduce() wins with SIMD pairwise sums
+NUMPY_MIN_SAMPLES = 64
 
 
 def calculate_average(values):
     """
     Calculate average from a list of values
-    Parameters: values (list of floats)
+    Parameters: values (list or NumPy array of floats)
     Returns: average (float)
     """
-    total = 0
-    # for loop: iterate through list
-    for value in values:
-        # arithmetic operator: addition (+=)
-        total += value
+    # Small inputs: math.fsum() gives an exactly rounded sum, no drift
+    # from adding floats one at a time
+    if len(values) < NUMPY_MIN_SAMPLES:
+        return math.fsum(values) / len(values)
     
+    # Large inputs: np.asarray() makes no copy when values is already a
+    # float64 array, and np.add.reduce() sums it pairwise in C
     # arithmetic operator: division
-    average = total / len(values)
+    np = _get_np()
+    arr = np.asarray(values, dtype=np.float64)
+    average = float(np.add.reduce(arr)) / arr.size
     return average
 
 
+def build_details_renderer(fields):
+    """
+    Generate a report function specialized to one VM config layout
+    Parameters:
+        fields (tuple): (label, field, format spec) for each report line
+    Returns:
+        render (function): Takes a VMConfig and returns the formatted
+        details block
+    """
+    # Write the source once with the labels and format specs baked into a
+    # single f-string over the config's slot attributes, then compile it:
+    # every call after that is just attribute reads, no dict lookups
+    template = "\n".join(f"{label}{{vm.{field}{spec}}}" for label, field, spec in fields)
+    source = f"def render(vm):\n    return f{template!r}\n"
+    
+    namespace = {}
+    exec(compile(source, "<vm_details>", "exec"), namespace)
+    return namespace["render"]
+
+
+# Built once at start-up; the report layout never changes between runs
+render_vm_details = build_details_renderer(vm_detail_fields)
+
+
+def batch_waste(cpu, cost, waste):
+    """
+    Per-VM and total monthly waste across a batch of VMs, in one pass
+    Parameters:
+        cpu (list or float64 array): Average CPU percentage per VM
+        cost (list or float64 array): Monthly cost per VM
+        waste (list or float64 array): Output, filled with each VM's monthly waste
+    Returns:
+        total (float): Sum of 50% of cost for every underutilized VM
+    """
+    total = 0.0
+    for i in range(len(cpu)):
+        # Underutilized: low CPU and a meaningful cost
+        if cpu[i] < 15.0 and cost[i] > 50.0:
+            waste[i] = 0.5 * cost[i]
+        else:
+            waste[i] = 0.0
+        total += waste[i]
+    return total
+
+
+@functools.cache
+def _get_batch_kernels():
+    """
+    JIT-compile the batch kernels with Numba on first call (cached afterwards)
+    Returns:
+        (serial, parallel) kernels, or None when Numba is not installed
+    """
+    # Numba is optional: without it analyze_batch() keeps every batch on
+    # the plain Python list loop
+    try:
+        from numba import njit, prange
+    except ImportError:
+        return None
+    
+    # The compiled kernels are cached under __pycache__ (or $NUMBA_CACHE_DIR;
+    # point it at a persistent path in containers), so only the first run
+    # after a code change pays the compile
+    serial = njit(cache=True, fastmath=True, boundscheck=False)(batch_waste)
+    
+    @njit(parallel=True, cache=True, fastmath=True, boundscheck=False)
+    def batch_waste_par(cpu, cost, waste):
+        """
+        Multi-core version of batch_waste() for large fleets
+        Parameters / Returns: same as batch_waste()
+        """
+        # prange(): iterations are split across threads (NUMBA_NUM_THREADS,
+        # default one per core); each writes only its own waste[i] and numba
+        # turns the += on total into a per-thread reduction
+        total = 0.0
+        for i in prange(len(cpu)):
+            if cpu[i] < 15.0 and cost[i] > 50.0:
+                waste[i] = 0.5 * cost[i]
+            else:
+                waste[i] = 0.0
+            total += waste[i]
+        return total
+    
+    # Warm-up: compile (or load from cache) the serial kernel now, so the
+    # batch loop never waits on the JIT (the parallel kernel compiles on
+    # the first batch big enough to use it)
+    np = _get_np()
+    serial(np.zeros(1), np.zeros(1), np.empty(1))
+    return serial, batch_waste_par
+
+
+# Batch size thresholds: below NUMPY_MIN_VMS the batch stays in Python lists
+# (no NumPy/Numba import at all); below PARALLEL_MIN_VMS waking the thread
+# pool costs more than the loop itself. Without Numba every batch stays in
+# lists: an interpreted loop over NumPy scalars is slower than over floats
+NUMPY_MIN_VMS = 64
+PARALLEL_MIN_VMS = 1024
+
+
+def analyze_batch(cpu, cost):
+    """
+    Per-VM and total monthly waste, picking the cheapest engine for the batch size
+    Parameters:
+        cpu (list of floats): Average CPU percentage per VM
+        cost (list of floats): Monthly cost per VM
+    Returns:
+        (waste, total): list of each VM's monthly waste, and their sum
+    """
+    n = len(cpu)
+    
+    # Small batch, or no JIT available: the plain Python loop over lists
+    # finishes before NumPy could even load
+    kernels = _get_batch_kernels() if n >= NUMPY_MIN_VMS else None
+    if kernels is None:
+        waste = [0.0] * n
+        return waste, batch_waste(cpu, cost, waste)
+    
+    # Large batch: pack the columns into contiguous float64 arrays and run
+    # the JIT kernel, parallel once there is enough work for every core
+    np = _get_np()
+    cpu_arr = np.asarray(cpu, dtype=np.float64)
+    cost_arr = np.asarray(cost, dtype=np.float64)
+    waste = np.empty(n)
+    
+    kernel = kernels[1] if n >= PARALLEL_MIN_VMS else kernels[0]
+    total = kernel(cpu_arr, cost_arr, waste)
+    return waste.tolist(), float(total)
+
+
 # --- Main Analysis Logic ---
-print("=" * 60)
-print("AZURE VM COST OPTIMIZATION REPORT")
-print("=" * 60)
+# Collect every report line in a list and write them all at once at the end:
+# one stdout write instead of a print() call per line
+out = []
+
+out.append(BANNER)
+out.append("AZURE VM COST OPTIMIZATION REPORT")
+out.append(BANNER)
 
-# Display VM details from dictionary
-print(f"\nVM Name: {vm_config['name']}")
-print(f"VM Size: {vm_config['size']}")
-print(f"Region: {vm_config['region']}")
-print(f"CPU Cores: {vm_config['cpu_cores']}")
-print(f"Monthly Cost: ${vm_config['monthly_cost']:.2f}")
+# Display VM details from the config object via the generated renderer
+out.extend(("", render_vm_details(vm_config)))
 
 # Calculate actual average from samples
 calculated_avg = calculate_average(cpu_samples)
-print(f"\nAverage CPU Usage: {calculated_avg:.2f}%")
-print(f"Monitoring Period: {monitoring_days} days")
+out.append(f"\nAverage CPU Usage: {calculated_avg:.2f}%")
+out.append(f"Monitoring Period: {monitoring_days} days")
 
 # Get recommendation by calling function
 recommendation = recommend_action(calculated_avg, is_production)
-print(f"\n>>> RECOMMENDATION: {recommendation}")
+out.append(f"\n>>> RECOMMENDATION: {recommendation}")
 
 # --- Cost Analysis with Control Flow ---
-print("\n" + "-" * 60)
-print("COST IMPACT ANALYSIS")
-print("-" * 60)
+out.extend(("", SEP))
+out.append("COST IMPACT ANALYSIS")
+out.append(SEP)
 
 # comparison operator: check if underutilized
 if calculated_avg < 20:
-    print("⚠️  VM is UNDERUTILIZED!")
+    out.append("⚠️  VM is UNDERUTILIZED!")
     
     # Calculate savings for different scenarios
+    # arithmetic operator: multiplication, written inline (a one-line
+    # helper would cost more in call overhead than the math itself)
     # 50% savings if downsizing
-    downsize_savings = calculate_potential_savings(monthly_cost, 0.50)
+    downsize_savings = monthly_cost * 0.50
     # 100% savings if stopping
-    stop_savings = calculate_potential_savings(monthly_cost, 1.0)
+    stop_savings = monthly_cost * 1.0
     
-    print(f"\nPotential Monthly Savings:")
-    print(f"  - If Downsized (50%): ${downsize_savings:.2f}")
-    print(f"  - If Stopped (100%): ${stop_savings:.2f}")
+    out.append(f"\nPotential Monthly Savings:")
+    out.append(f"  - If Downsized (50%): ${downsize_savings:.2f}")
+    out.append(f"  - If Stopped (100%): ${stop_savings:.2f}")
     
     # arithmetic operator: multiplication for annual savings
     annual_savings = downsize_savings * 12
-    print(f"  - Annual Savings (Downsize): ${annual_savings:.2f}")
+    out.append(f"  - Annual Savings (Downsize): ${annual_savings:.2f}")
 
 else:
-    print("✓ VM utilization is acceptable")
+    out.append("✓ VM utilization is acceptable")
 
 # --- Working with Tuples ---
-# Unpack tuple values
-low_threshold, medium_threshold, high_threshold = cost_thresholds
-
-print(f"\n" + "-" * 60)
-print("COST CATEGORY ANALYSIS")
-print("-" * 60)
-
-# Control flow: categorize VM by cost using elif
-if monthly_cost < low_threshold:
-    cost_category = "Low Cost"
-    priority = "Monitor quarterly"
-elif monthly_cost >= low_threshold and monthly_cost < medium_threshold:
-    cost_category = "Medium Cost"
-    priority = "Monitor monthly"
-elif monthly_cost >= medium_threshold and monthly_cost < high_threshold:
-    cost_category = "High Cost"
-    priority = "Monitor weekly"
-else:
-    cost_category = "Very High Cost"
-    priority = "Monitor daily"
-
-print(f"Cost Category: {cost_category}")
-print(f"Review Priority: {priority}")
-
-# --- Multiple VMs Analysis with While Loop ---
-print("\n" + "=" * 60)
-print("BATCH VM ANALYSIS")
-print("=" * 60)
-
-# list: multiple VMs to analyze
-vm_list = [
-    {"name": "dev-vm-01", "cpu": 8.5, "cost": 120.00},
-    {"name": "prod-db-vm", "cpu": 45.2, "cost": 380.00},
-    {"name": "test-vm-03", "cpu": 5.1, "cost": 95.00},
-]
-
-# while loop: process VMs using index
-index = 0
-total_wasted_cost = 0
-
-# comparison operator: less than
-while index < len(vm_list):
-    vm = vm_list[index]
-    
-    print(f"\nAnalyzing: {vm['name']}")
-    print(f"  CPU: {vm['cpu']}% | Cost: ${vm['cost']:.2f}")
-    
-    # logical operator: 'and' to combine conditions
-    if vm['cpu'] < 15 and vm['cost'] > 50:
-        waste = calculate_potential_savings(vm['cost'], 0.5)
-        # arithmetic operator: addition (+=)
-        total_wasted_cost += waste
-        print(f"  ⚠️  Wasting: ${waste:.2f}/month")
+out.extend(("", SEP))
+out.append("COST CATEGORY ANALYSIS")
+out.append(SEP)
+
+# Categorize VM by cost: bisect_right() puts a cost equal to a threshold in
+# the higher category, exactly like the >= comparisons it replaces
+cost_index = bisect.bisect_right(cost_thresholds, monthly_cost)
+cost_category = cost_categories[cost_index]
+priority = review_priorities[cost_index]
+
+out.append(f"Cost Category: {cost_category}")
+out.append(f"Review Priority: {priority}")
+
+# --- Multiple VMs Analysis with For Loop ---
+out.extend(("", BANNER))
+out.append("BATCH VM ANALYSIS")
+out.append(BANNER)
+
+# Multiple VMs to analyze, stored as parallel lists (struct-of-arrays):
+# one column per field instead of a dict per VM; analyze_batch() packs the
+# numeric columns into float64 arrays once the fleet is large enough
+vm_names = ["dev-vm-01", "prod-db-vm", "test-vm-03"]
+vm_cpu = [8.5, 45.2, 5.1]
+vm_cost = [120.00, 380.00, 95.00]
+
+# One fused pass applies the underutilization rule, fills each VM's waste
+# and sums the total; the loop below only prints the precomputed values
+vm_waste, total_wasted_cost = analyze_batch(vm_cpu, vm_cost)
+
+# %-format templates, one per outcome, each covering a VM's whole block:
+# the string is built once here and every VM costs a single % call
+wasting_template = "\nAnalyzing: %s\n  CPU: %s%% | Cost: $%.2f\n  ⚠️  Wasting: $%.2f/month"
+efficient_template = "\nAnalyzing: %s\n  CPU: %s%% | Cost: $%.2f\n  ✓ Efficiently utilized"
+
+# for loop + zip(): walk the parallel columns side by side, no index
+# bookkeeping or len() check per step
+for name, cpu_v, cost_v, waste_v in zip(vm_names, vm_cpu, vm_cost, vm_waste):
+    # comparison operator: only underutilized VMs have waste
+    if waste_v > 0:
+        out.append(wasting_template % (name, cpu_v, cost_v, waste_v))
     else:
-        print(f"  ✓ Efficiently utilized")
-    
-    # arithmetic operator: increment
-    index += 1
+        out.append(efficient_template % (name, cpu_v, cost_v))
+
+out.append(f"\n>>> Total Potential Monthly Savings: ${total_wasted_cost:.2f}")
+out.append(f">>> Annual Savings Opportunity: ${total_wasted_cost * 12:.2f}")
 
-print(f"\n>>> Total Potential Monthly Savings: ${total_wasted_cost:.2f}")
-print(f">>> Annual Savings Opportunity: ${total_wasted_cost * 12:.2f}")
+out.extend(("", BANNER))
+out.append("ANALYSIS COMPLETE")
+out.append(BANNER)
 
-print("\n" + "=" * 60)
-print("ANALYSIS COMPLETE")
-print("=" * 60)
\ No newline at end of file
+sys.stdout.write("\n".join(out) + "\n")